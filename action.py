@@ -38,7 +38,7 @@ class Action:
         """
         return all(state.get(k, 0) >= v for k, v in self.preconditions.items())
 
-    def execute(self, state: Dict[str, int], on_interrupt=None, verbose=True):
+    def execute(self, state: Dict[str, int], on_interrupt=None, verbose=True, clock=None):
         """
         Executes the action, updating the state based on the action's effects after the specified duration.
         The action can be interrupted if the provided callback returns True.
@@ -47,6 +47,8 @@ class Action:
             state (Dict[str, int]): The current state of the agent.
             on_interrupt (Callable, optional): A callback function to check if the action should be interrupted.
             verbose (bool): If True, enables detailed logging of the action execution.
+            clock (RealTimeClock | SimulationClock, optional): The clock used to wait for the duration.
+                                                               Defaults to real time.
 
         Returns:
             bool: True if the action completes successfully, False if it was interrupted.
@@ -58,12 +60,13 @@ class Action:
         if verbose:
             print(f"Starting action: {self.name} (duration: {self.duration}s)")
 
+        sleep = clock.sleep if clock is not None else time.sleep
         for i in range(self.duration):
             if on_interrupt and on_interrupt():
                 if verbose:
                     print(f"Action {self.name} interrupted!")
                 return False
-            time.sleep(1)
+            sleep(1)
 
         if verbose:
             print(f"Action {self.name} completed!")
@@ -11,10 +11,12 @@ from event_manager import EventManager
 from goal import Goal
 from goap_planner import GOAPPlanner
 from helpers import is_goal_satisfied
+from simulation import RealTimeClock
 
 
 class Agent:
-    def __init__(self, actions: List[Action], planner: GOAPPlanner, event_manager: EventManager, verbose: bool = True):
+    def __init__(self, actions: List[Action], planner: GOAPPlanner, event_manager: EventManager, verbose: bool = True,
+                 clock=None):
         """
         Initializes the Agent with a set of actions, a planner, and an event manager.
 
@@ -23,12 +25,15 @@ class Agent:
             planner (GOAPPlanner): The planner used to generate action sequences.
             event_manager (EventManager): The event manager that handles external events.
             verbose (bool): If True, enables detailed logging of the agent's actions and state changes.
+            clock (RealTimeClock | SimulationClock, optional): The clock used to execute the actions.
+                                                               Defaults to real time.
         """
         self.actions = actions
         self.planner = planner
         self.event_manager = event_manager
         self.should_replan = False
         self.verbose = verbose
+        self.clock = clock if clock is not None else RealTimeClock()
         self.event_manager.subscribe(self.on_event)
 
     def on_event(self):
@@ -69,7 +74,7 @@ class Agent:
             plan_depth += 1
 
             if not action or not action.execute(current_state, on_interrupt=lambda: self.should_replan,
-                                                verbose=self.verbose):
+                                                verbose=self.verbose, clock=self.clock):
                 self.should_replan = False
 
                 if self.verbose:
@@ -122,3 +127,118 @@ class Agent:
         if self.verbose:
             print(f"Final State: {current_state}")
             print("Average action executed before replan: ", sum(plan_depths) / len(plan_depths))
+
+    def execute_realtime(self, initial_state: Dict[str, int], context: Dict = None, lookahead: int = 32,
+                         max_restarts: int = 10):
+        """
+        Executes actions as soon as the real-time search of the planner commits to them, instead of
+        waiting for a complete plan. The search continues from the state observed after each action.
+        If an action fails or is interrupted, or if the search ends before reaching the goal, the search
+        restarts from the current state and keeps what it learned, up to max_restarts times. The goal
+        is checked by the planner, so it is reached under the same value abstraction as in the search.
+
+        Args:
+            initial_state (Dict[str, int]): The starting state of the agent.
+            context (Dict): Additional context, such as callbacks for state updates
+                            or goal state, defaulting to None.
+            lookahead (int): Max number of nodes expanded by the planner before committing to an action.
+            max_restarts (int): Max number of times the search is restarted before giving up.
+        """
+        if context is None:
+            context = {}
+
+        goals = context.get("goals", None)
+        current_state = initial_state.copy()
+        steps = self.planner.plan_realtime(current_state, goals, context, lookahead)
+        action_name, goal_achieved = self._next_realtime_action(steps, None)
+        actions_executed = 0
+        restarts = 0
+
+        while action_name is not None:
+            if self.verbose:
+                print(f"Current State: {current_state}")
+                print(f"Next action: {action_name}")
+
+            action = next((a for a in self.actions if a.name == action_name), None)
+
+            if not action or not action.execute(current_state, on_interrupt=lambda: self.should_replan,
+                                                verbose=self.verbose, clock=self.clock):
+                self.should_replan = False
+
+                if self.verbose:
+                    print(f"Action {action_name} failed or interrupted.")
+
+                restarts += 1
+                steps, action_name, goal_achieved = self._restart_realtime(current_state, context, lookahead,
+                                                                           restarts, max_restarts)
+                continue
+
+            actions_executed += 1
+            if "post_action_callback" in context:
+                context["post_action_callback"](action, current_state, context)
+
+            if "update_state_callback" in context:
+                context["update_state_callback"](current_state, context)
+
+            if self.verbose:
+                print(f"Updated state after action {action_name}: {current_state}")
+
+            action_name, goal_achieved = self._next_realtime_action(steps, current_state)
+            if action_name is None and not goal_achieved:
+                if self.verbose:
+                    print("End of real-time search reached, but goal not achieved.")
+
+                restarts += 1
+                steps, action_name, goal_achieved = self._restart_realtime(current_state, context, lookahead,
+                                                                           restarts, max_restarts)
+
+        if self.verbose:
+            if goal_achieved:
+                print("Goal achieved!")
+            else:
+                print("No valid action could be found by the real-time search!")
+            print(f"Final State: {current_state}")
+            print("Actions executed: ", actions_executed)
+
+    def _restart_realtime(self, current_state, context, lookahead, restarts, max_restarts):
+        """
+        Starts a new real-time search from the current state, unless it was already restarted
+        max_restarts times.
+
+        Args:
+            current_state (Dict[str, int]): The current state of the agent.
+            context (Dict): Additional context, such as callbacks for state updates or goal state.
+            lookahead (int): Max number of nodes expanded by the planner before committing to an action.
+            restarts (int): Number of restarts, including this one.
+            max_restarts (int): Max number of times the search is restarted before giving up.
+
+        Returns:
+            Tuple[Generator, str, bool]: The new search, its first action (None if there is none) and
+            True if the goal is already achieved.
+        """
+        if restarts > max_restarts:
+            return None, None, False
+
+        if self.verbose:
+            print("Searching again...")
+        steps = self.planner.plan_realtime(current_state, context.get("goals", None), context, lookahead)
+        action_name, goal_achieved = self._next_realtime_action(steps, None)
+        return steps, action_name, goal_achieved
+
+    @staticmethod
+    def _next_realtime_action(steps, observed_state):
+        """
+        Gets the next action of a real-time search.
+
+        Args:
+            steps (Generator): The real-time search of the planner.
+            observed_state (Dict[str, int]): The state observed after the last action, None before the first one.
+
+        Returns:
+            Tuple[str, bool]: The next action, None if the search is over, and True if the search is over
+            because the goal is achieved.
+        """
+        try:
+            return steps.send(observed_state), False
+        except StopIteration as stop:
+            return None, bool(stop.value)
@@ -3,12 +3,20 @@ This module implements the EventManager class, which manages event subscriptions
 and notifies listeners when an event occurs.
 """
 
+from simulation import RealTimeClock
+
+
 class EventManager:
-    def __init__(self):
+    def __init__(self, clock=None):
         """
         Initializes the EventManager with an empty list of listeners.
+
+        Args:
+            clock (RealTimeClock | SimulationClock, optional): The clock used to schedule events.
+                                                               Defaults to real time.
         """
         self.listeners = []
+        self.clock = clock if clock is not None else RealTimeClock()
 
     def subscribe(self, callback):
         """
@@ -25,3 +33,24 @@ class EventManager:
         """
         for listener in self.listeners:
             listener()
+
+    def schedule_notify(self, delay: float, period: float = None):
+        """
+        Schedules a notification of all the listeners once the delay is over.
+
+        Args:
+            delay (float): The time (in seconds) to wait before notifying the listeners.
+            period (float, optional): If provided, the notification is repeated every period seconds.
+        """
+        self.clock.schedule(delay, self._scheduled_notify, period)
+
+    def _scheduled_notify(self, period):
+        """
+        Notifies the listeners, then schedules the next notification if it is periodic.
+
+        Args:
+            period (float): The time (in seconds) before the next notification, None to notify once.
+        """
+        self.notify()
+        if period is not None:
+            self.schedule_notify(period, period)
@@ -5,16 +5,21 @@ of actions to reach a specified goal state from a start state.
 """
 
 import heapq
+import os
 from enum import Enum
-from typing import List, Dict, Tuple, Union
+from typing import List, Dict, Tuple, Union, Generator
 from action import Action
 from goal import Goal
 from helpers import is_goal_satisfied
+from parallel_search import plan_hash_distributed
+from search_trace import SearchTrace, PUSH, EXPAND, GOAL
 
 
 class PlanningMode(Enum):
     SEQUENTIAL = 1
     GLOBAL = 2
+    MEMORY_BOUNDED = 3
+    PARALLEL = 4
 
 class PlanProgress:
     def __init__(self, current_cost: float, current_state_tuple: Dict, plan: List, elapsed_time: float):
@@ -31,6 +36,7 @@ class PlanProgress:
         self.current_state_tuple = current_state_tuple
         self.plan = plan
         self.elapsed_time = elapsed_time
+        self.trace_info = None
 
     def __lt__(self, other):
         """
@@ -53,16 +59,37 @@ class PlanProgress:
 
 
 class GOAPPlanner:
-    def __init__(self, actions: List[Action], max_depth: int=20):
+    def __init__(self, actions: List[Action], max_depth: int=20, transposition_table_size: int=100000,
+                 num_workers: int=None, state_bounds: Dict[str, Tuple[int, int]]=None,
+                 value_abstraction: Dict[str, int]=None, trace: SearchTrace=None,
+                 learned_heuristics_size: int=100000):
         """
         Initializes the GOAPPlanner with a list of possible actions.
 
         Args:
             actions (List[Action]): A list of possible actions the agent can perform.
             max_depth (int): Max possible depth for the planner to reach
+            transposition_table_size (int): Max number of states remembered by the memory bounded mode.
+            num_workers (int): Number of processes used by the parallel mode. Defaults to the number of cores.
+            state_bounds (Dict[str, Tuple[int, int]]): The (min, max) values of some variables. The values
+                                                       reached while planning are clamped to these bounds.
+            value_abstraction (Dict[str, int]): Threshold of some variables. While planning, any value at or
+                                                above the threshold is considered the same state, and it
+                                                meets the goals and preconditions above the threshold.
+            trace (SearchTrace): If provided, the global and sequential modes record their pushes and
+                                 expansions in it. Nothing is recorded otherwise.
+            learned_heuristics_size (int): Max number of heuristic values remembered by the real-time search.
         """
         self.actions = actions
         self.max_depth = max_depth
+        self.transposition_table_size = transposition_table_size
+        self.num_workers = num_workers if num_workers is not None else os.cpu_count()
+        self.state_bounds = state_bounds if state_bounds is not None else {}
+        self.value_abstraction = value_abstraction if value_abstraction is not None else {}
+        self.relevant_actions_cache = {}
+        self.learned_heuristics = {}
+        self.learned_heuristics_size = learned_heuristics_size
+        self.trace = trace
         self.plan_requested = 0
         self.node_developed = 0
         self.action_tested = 0
@@ -87,15 +114,76 @@ class GOAPPlanner:
             goals = [goals]
 
         self.plan_requested += 1
+        actions = self._relevant_actions(goals, context)
         if mode == PlanningMode.SEQUENTIAL:
-            return self._plan_sequential(goals, start_state, context)
+            return self._plan_sequential(goals, start_state, context, actions)
+        elif mode == PlanningMode.MEMORY_BOUNDED:
+            return self._plan_memory_bounded(goals, start_state, context, actions)
+        elif mode == PlanningMode.PARALLEL:
+            return self._plan_parallel(goals, start_state, context, actions)
 
-        return self._plan_global(goals, start_state, context)
+        return self._plan_global(goals, start_state, context, actions)
 
-    @staticmethod
-    def _update_initial_state(initial_state, context):
+    def plan_realtime(self, start_state: Dict[str, int], goals: Union[List[Goal], Goal], context: Dict,
+                      lookahead: int = 32, max_steps: int = None) -> Generator[str, Dict[str, int], bool]:
+        """
+        Generates a plan one action at a time using a real-time search (RTAA*). Each step runs an A*
+        lookahead limited to a number of expanded nodes, commits to the first action toward the most
+        promising node and learns better heuristic values for the expanded states. The learned values
+        are kept by the planner between calls, so repeated episodes converge to an optimal plan when
+        the heuristics are admissible. At most learned_heuristics_size values are kept; clear
+        learned_heuristics when the actions or the context change, since the values learned before
+        may not hold anymore.
+
+        The state observed after executing an action can be given back with send(). Otherwise,
+        the state predicted by the action effects is used.
+
+        Args:
+            start_state (Dict[str, int]): The initial state of the agent.
+            goals (Union[List[Goal], Goal]): A list of goals, each containing a goal state and an associated heuristic function.
+            context (Dict): Additional context, including callbacks for state updates and environment information.
+            lookahead (int): Max number of nodes expanded before committing to an action.
+            max_steps (int): Max number of actions yielded. Defaults to max_depth.
+
+        Yields:
+            str: The name of the next action to execute.
+
+        Returns:
+            bool: True if the search stopped because a goal is satisfied.
+        """
+        if goals is None:
+            return False
+        elif isinstance(goals, Goal):
+            goals = [goals]
+
+        self.plan_requested += 1
+        actions = self._relevant_actions(goals, context)
+        goal_key = tuple(tuple(sorted(goal_info.goal_state.items())) for goal_info in goals)
+        if max_steps is None:
+            max_steps = self.max_depth
+
+        current_state = self._update_initial_state(start_state, context)
+        for _ in range(max_steps):
+            if self._is_goal_satisfied(goals, current_state):
+                return True
+
+            step = self._realtime_step(goals, current_state, context, actions, lookahead, goal_key)
+            if step is None:
+                return False
+
+            action, predicted_state = step
+            observed_state = yield action.name
+            if observed_state is None:
+                current_state = predicted_state
+            else:
+                current_state = self._update_initial_state(observed_state, context)
+
+        return self._is_goal_satisfied(goals, current_state)
+
+    def _update_initial_state(self, initial_state, context):
         """
-        Updates the initial state using a callback from the context, if provided.
+        Updates the initial state using a callback from the context, if provided, then
+        applies the state bounds and the value abstraction.
 
         Args:
             initial_state (Dict): The initial state dictionary to update.
@@ -107,29 +195,284 @@ class GOAPPlanner:
         updated_start_state = initial_state.copy()
         if "update_state_callback" in context:
             context["update_state_callback"](updated_start_state, context)
+        self._normalize_state(updated_start_state)
         return updated_start_state
 
-    def _plan_sequential(self, goals, initial_state, context):
+    def _relevant_actions(self, goals, context):
+        """
+        Finds the actions that can contribute to the goals. Going backward from the goal variables,
+        an action is relevant if it changes a relevant variable, and its preconditions then become
+        relevant too. The actions that are not relevant can't help reaching any goal, so they are
+        not considered by the search. The result is cached per set of goal variables.
+
+        The update state callback can derive variables from any other one. The analysis is only done
+        when the context declares what each derived variable depends on with "derived_dependencies"
+        (Dict[str, List[str]]). Otherwise, all the actions are kept.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            context (Dict): Context dictionary for callbacks and additional information.
+
+        Returns:
+            List[Action]: The relevant actions, in the same order as the planner actions.
+        """
+        if "update_state_callback" in context and "derived_dependencies" not in context:
+            return self.actions
+
+        dependencies = context.get("derived_dependencies", {})
+        goal_variables = frozenset(k for goal_info in goals for k in goal_info.goal_state)
+        key = (tuple(id(action) for action in self.actions), goal_variables,
+               tuple(sorted((k, tuple(sorted(v))) for k, v in dependencies.items())))
+        if key in self.relevant_actions_cache:
+            return self.relevant_actions_cache[key]
+
+        relevant_variables = set()
+        variables_to_visit = list(goal_variables)
+        relevant = set()
+        while variables_to_visit:
+            variable = variables_to_visit.pop()
+            if variable in relevant_variables:
+                continue
+            relevant_variables.add(variable)
+            variables_to_visit.extend(dependencies.get(variable, []))
+
+            for i, action in enumerate(self.actions):
+                if i not in relevant and variable in action.effects:
+                    relevant.add(i)
+                    variables_to_visit.extend(action.preconditions)
+
+        relevant_actions = [action for i, action in enumerate(self.actions) if i in relevant]
+        self.relevant_actions_cache[key] = relevant_actions
+        return relevant_actions
+
+    def _plan_sequential(self, goals, initial_state, context, actions):
         """
         Generates a plan by sequentially attempting to satisfy each goal in order. This
         is a special case where we want to process one goal after the other.
 
+        The search graph (best costs, parents and frontier) is shared between the goals,
+        so the states expanded while looking for a goal are not expanded again for the
+        next ones. A node is a state reached with a given cost and depth: a state can be
+        kept more than once when a costlier path to it is shorter, since it can go deeper
+        before max_depth. Goals that can't be reached even when ignoring the negative effects
+        of the actions are skipped without searching.
+
         Args:
             goals (List[Goal]): A list of goals with associated goal states and heuristics.
             initial_state (Dict): The starting state for the planner.
             context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
 
         Returns:
            Tuple[List[str], float]: A tuple containing the plan and its total cost.
         """
-        for goal_info in goals:
-            plan, cost = self._plan_global([goal_info], initial_state, context)
-            if len(plan) > 0:
-                return plan, cost
+        updated_start_state = self._update_initial_state(initial_state, context)
+        start_tuple = self._state_to_tuple(updated_start_state)
+
+        nodes = {start_tuple: (0, 0, 0)}
+        parents = {}
+        expanded = []
+        frontier = [(0, 0, 0, 0, start_tuple)]
+        node_ids = {}
+        if self.trace is not None:
+            node_ids[(start_tuple, 0, 0)] = self.trace.new_node_id()
+            self.trace.record(PUSH, node_ids[(start_tuple, 0, 0)], -1, None, 0, 0, -1)
+
+        for goal_index, goal_info in enumerate(goals):
+            if self._is_goal_satisfied([goal_info], updated_start_state):
+                continue
+            if not self._is_goal_reachable(goal_info, updated_start_state, context):
+                continue
+
+            candidates = [node[1:] for node in frontier if not self._is_stale(nodes, node[4], node[1], node[3])]
+            candidates += [node for node in expanded if self._is_goal_satisfied([goal_info], dict(node[3]))]
+            frontier = []
+            for cost, elapsed_time, depth, state_tuple in candidates:
+                priority = cost + self._estimate([goal_info], dict(state_tuple), context)
+                frontier.append((priority, cost, elapsed_time, depth, state_tuple))
+            heapq.heapify(frontier)
+
+            goal_node = self._shared_search(goal_info, goal_index, context, actions, frontier, nodes, parents,
+                                            expanded, node_ids)
+            if goal_node is not None:
+                return self._rebuild_plan(goal_node, parents), goal_node[1]
 
         return [], float('inf')
 
-    def _plan_global(self, goals, initial_state, context):
+    def _shared_search(self, goal_info, goal_index, context, actions, frontier, nodes, parents, expanded, node_ids):
+        """
+        Runs an A* search for one goal on a search graph that is kept between goals. A state is
+        expanded again only if a path to it is found that is cheaper or shorter than the last kept one.
+
+        Args:
+            goal_info (Goal): The goal to reach.
+            goal_index (int): The index of the goal, used by the trace.
+            context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
+            frontier (List): Heap of (priority, cost, elapsed time, depth, state tuple). It is updated in place.
+            nodes (Dict): Last kept (cost, elapsed time, depth) of each state. It is updated in place.
+            parents (Dict): Parent node and action name for each (state tuple, cost, depth) node. It is
+                            updated in place.
+            expanded (List): The (cost, elapsed time, depth, state tuple) of the nodes already expanded.
+                             It is updated in place.
+            node_ids (Dict): Trace node id of each node. Only used when a trace is recorded.
+
+        Returns:
+            Tuple: The (state tuple, cost, depth) node satisfying the goal, or None if the goal could not
+            be reached.
+        """
+        trace = self.trace
+        while frontier:
+            priority, cost, elapsed_time, depth, state_tuple = heapq.heappop(frontier)
+            if self._is_stale(nodes, state_tuple, cost, depth):
+                continue
+
+            self.node_developed += 1
+            if depth >= self.max_depth:
+                continue
+
+            node = (state_tuple, cost, depth)
+            current_state = dict(state_tuple)
+            if self._is_goal_satisfied([goal_info], current_state):
+                if trace is not None:
+                    self._record_shared_event(GOAL, node, parents, node_ids, priority, goal_index)
+                return node
+
+            expanded.append((cost, elapsed_time, depth, state_tuple))
+            if trace is not None:
+                self._record_shared_event(EXPAND, node, parents, node_ids, priority, goal_index)
+
+            for action in actions:
+                if self._is_applicable(action, current_state):
+                    new_state = self._apply_action(action, current_state, context)
+                    new_tuple = self._state_to_tuple(new_state)
+                    new_cost = cost + action.cost
+                    new_depth = depth + 1
+                    if new_tuple in nodes:
+                        best_cost, _, best_depth = nodes[new_tuple]
+                        if best_cost <= new_cost and best_depth <= new_depth:
+                            continue
+
+                    new_elapsed_time = elapsed_time + action.duration
+                    new_node = (new_tuple, new_cost, new_depth)
+                    nodes[new_tuple] = (new_cost, new_elapsed_time, new_depth)
+                    parents[new_node] = (node, action.name)
+                    h = self._estimate([goal_info], new_state, context)
+                    heapq.heappush(frontier, (new_cost + h, new_cost, new_elapsed_time, new_depth, new_tuple))
+                    if trace is not None:
+                        node_ids[new_node] = trace.new_node_id()
+                        trace.record(PUSH, node_ids[new_node], node_ids[node], action.name, new_cost, h, goal_index)
+
+        return None
+
+    @staticmethod
+    def _is_stale(nodes, state_tuple, cost, depth):
+        """
+        Checks if a node of the frontier was replaced by a node of the same state that is at least as
+        cheap and as shallow. Such a node can't lead to a better plan, so it doesn't need to be expanded.
+
+        Args:
+            nodes (Dict): Last kept (cost, elapsed time, depth) of each state.
+            state_tuple (Tuple): The state of the node.
+            cost (float): The cost of the node.
+            depth (int): The depth of the node.
+
+        Returns:
+            bool: True if the node can be skipped.
+        """
+        best_cost, _, best_depth = nodes[state_tuple]
+        if (best_cost, best_depth) == (cost, depth):
+            return False
+
+        return best_cost <= cost and best_depth <= depth
+
+    def _record_shared_event(self, event, node, parents, node_ids, priority, goal_index):
+        """
+        Records the expansion of a node, or the goal found, in the trace of the sequential mode.
+
+        Args:
+            event (str): EXPAND or GOAL.
+            node (Tuple): The (state tuple, cost, depth) node popped from the frontier.
+            parents (Dict): Parent node and action name for each node.
+            node_ids (Dict): Trace node id of each node.
+            priority (float): The priority of the node in the frontier.
+            goal_index (int): The index of the goal being searched.
+        """
+        parent_node, action_name = parents.get(node, (None, None))
+        parent_id = node_ids.get(parent_node, -1)
+        cost = node[1]
+        self.trace.record(event, node_ids[node], parent_id, action_name, cost, priority - cost, goal_index)
+
+    @staticmethod
+    def _rebuild_plan(node, parents):
+        """
+        Rebuilds the list of actions leading to a node by following the parents.
+
+        Args:
+            node (Tuple): The (state tuple, cost, depth) node ending the plan.
+            parents (Dict): Parent node and action name for each node.
+
+        Returns:
+            List[str]: The list of actions in the plan.
+        """
+        plan = []
+        while node in parents:
+            node, action_name = parents[node]
+            plan.append(action_name)
+
+        plan.reverse()
+        return plan
+
+    def _is_goal_reachable(self, goal_info, start_state, context):
+        """
+        Cheap check telling if a goal could be reached. The actions are relaxed: a variable that an
+        applicable action can increase (or decrease) is considered able to reach any higher (or lower)
+        value within its bounds. The goal values are abstracted and compared to the abstracted bounds,
+        like the states. When the goal is unreachable in this relaxation, it is unreachable for the
+        planner too.
+        Variables derived by the update state callback can't be analysed, so the check always passes
+        when a callback is provided.
+
+        Args:
+            goal_info (Goal): The goal to check.
+            start_state (Dict): The already updated starting state.
+            context (Dict): Context dictionary for callbacks and additional information.
+
+        Returns:
+            bool: False if the goal is certainly unreachable, True otherwise.
+        """
+        if "update_state_callback" in context:
+            return True
+
+        increasable = set()
+        decreasable = set()
+        remaining_actions = list(self.actions)
+        reached_new_action = True
+        while reached_new_action:
+            reached_new_action = False
+            for action in list(remaining_actions):
+                if all(start_state.get(k, 0) >= self._abstract_value(k, v) or k in increasable
+                       for k, v in action.preconditions.items()):
+                    remaining_actions.remove(action)
+                    reached_new_action = True
+                    increasable.update(k for k, v in action.effects.items() if v > 0)
+                    decreasable.update(k for k, v in action.effects.items() if v < 0)
+
+        for k, v in goal_info.goal_state.items():
+            v = self._abstract_value(k, v)
+            lower_bound, upper_bound = self.state_bounds.get(k, (float('-inf'), float('inf')))
+            if not self._abstract_value(k, lower_bound) <= v <= self._abstract_value(k, upper_bound):
+                return False
+
+            current_value = start_state.get(k, 0)
+            if current_value < v and k not in increasable:
+                return False
+            if current_value > v and k not in decreasable:
+                return False
+
+        return True
+
+    def _plan_global(self, goals, initial_state, context, actions):
         """
         Generates a global plan for the provided goals from the initial state.
         This will try to expand all the plans at the same time and return as
@@ -139,47 +482,50 @@ class GOAPPlanner:
             goals (List[Goal]): A list of goals with associated goal states and heuristics.
             initial_state (Dict): The starting state for the planner.
             context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
 
         Returns:
             Tuple[List[str], float]: A tuple containing the list of actions in the plan and the total cost.
         """
         updated_start_state = self._update_initial_state(initial_state, context)
 
+        trace = self.trace
         explored = set()
         frontier = []
         initial_progress = PlanProgress(0, self._state_to_tuple(updated_start_state), [], 0)
+        if trace is not None:
+            initial_progress.trace_info = (trace.new_node_id(), -1, -1)
+            trace.record(PUSH, initial_progress.trace_info[0], -1, None, 0, 0, -1)
         heapq.heappush(frontier, (0, initial_progress))
 
         while frontier:
             self.node_developed += 1
-            _, progress = heapq.heappop(frontier)
+            priority, progress = heapq.heappop(frontier)
             if len(progress.plan) >= self.max_depth:
                 continue
 
             current_state = dict(progress.current_state_tuple)
 
-            if is_goal_satisfied(goals, current_state):
+            if self._is_goal_satisfied(goals, current_state):
+                if trace is not None:
+                    self._record_global_event(GOAL, progress, priority)
                 return progress.plan, progress.current_cost
 
             if progress.current_state_tuple in explored:
                 continue
             explored.add(progress.current_state_tuple)
+            if trace is not None:
+                self._record_global_event(EXPAND, progress, priority)
 
-            for action in self.actions:
-                if action.is_applicable(current_state):
-                    new_state = current_state.copy()
-                    self.action_tested += 1
-                    for k, v in action.effects.items():
-                        new_state[k] = new_state.get(k, 0) + v
-
-                    if "update_state_callback" in context:
-                        context["update_state_callback"](new_state, context)
+            for action in actions:
+                if self._is_applicable(action, current_state):
+                    new_state = self._apply_action(action, current_state, context)
 
                     new_plan = progress.plan + [action.name]
                     new_cost = progress.current_cost + action.cost
                     new_elapsed_time = progress.elapsed_time + action.duration
 
-                    for goal_info in goals:
+                    for goal_index, goal_info in enumerate(goals):
                         h = 0
                         if goal_info.heuristic is not None:
                             h = goal_info.heuristic(new_state, goal_info.goal_state, context)
@@ -189,10 +535,376 @@ class GOAPPlanner:
                             raise Exception("infinite weight. Something is wrong")
 
                         new_progress = PlanProgress(new_cost, self._state_to_tuple(new_state), new_plan, new_elapsed_time)
+                        if trace is not None:
+                            new_progress.trace_info = (trace.new_node_id(), progress.trace_info[0], goal_index)
+                            trace.record(PUSH, new_progress.trace_info[0], progress.trace_info[0], action.name,
+                                         new_cost, h, goal_index)
                         heapq.heappush(frontier, (priority, new_progress))
 
         return [], float('inf')
 
+    def _record_global_event(self, event, progress, priority):
+        """
+        Records the expansion of a node, or the goal found, in the trace of the global mode.
+
+        Args:
+            event (str): EXPAND or GOAL.
+            progress (PlanProgress): The node popped from the frontier.
+            priority (float): The priority of the node in the frontier.
+        """
+        node_id, parent_id, goal_index = progress.trace_info
+        action_name = progress.plan[-1] if progress.plan else None
+        self.trace.record(event, node_id, parent_id, action_name, progress.current_cost,
+                          priority - progress.current_cost, goal_index)
+
+    def _plan_memory_bounded(self, goals, initial_state, context, actions):
+        """
+        Generates a plan using IDA*. Instead of keeping every explored state and the whole
+        frontier in memory, the search is a depth first search bounded by a cost threshold
+        that grows until a plan is found. Only the current path and a transposition table
+        capped at transposition_table_size states are kept, so states can be expanded
+        more than once but memory stays bounded. The returned plan has the same cost as
+        the one from the global mode.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            initial_state (Dict): The starting state for the planner.
+            context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
+
+        Returns:
+            Tuple[List[str], float]: A tuple containing the list of actions in the plan and the total cost.
+        """
+        updated_start_state = self._update_initial_state(initial_state, context)
+        if self._is_goal_satisfied(goals, updated_start_state):
+            return [], 0
+
+        threshold = self._estimate(goals, updated_start_state, context)
+
+        while threshold != float('inf'):
+            transposition_table = {}
+            plan, cost, next_threshold = self._bounded_search(goals, updated_start_state, context, actions,
+                                                              threshold, transposition_table)
+            if plan is not None:
+                return plan, cost
+
+            threshold = next_threshold
+
+        return [], float('inf')
+
+    def _plan_parallel(self, goals, initial_state, context, actions):
+        """
+        Generates a plan with a hash distributed A* search running on num_workers processes.
+        The returned plan has the same cost as the one from the global mode.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            initial_state (Dict): The starting state for the planner.
+            context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
+
+        Returns:
+            Tuple[List[str], float]: A tuple containing the list of actions in the plan and the total cost.
+        """
+        updated_start_state = self._update_initial_state(initial_state, context)
+        return plan_hash_distributed(self, goals, updated_start_state, context, actions, self.num_workers)
+
+    def _bounded_search(self, goals, start_state, context, actions, threshold, transposition_table):
+        """
+        Runs one iteration of IDA*: a depth first search that does not go past the cost threshold.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            start_state (Dict): The already updated starting state.
+            context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
+            threshold (float): Max value of cost + heuristic for a node to be expanded.
+            transposition_table (Dict): Best (cost, depth) seen for each state during this iteration.
+
+        Returns:
+            Tuple[List[str], float, float]: The plan and its cost if one was found (None otherwise) and
+            the smallest cost + heuristic that exceeded the threshold.
+        """
+        next_threshold = float('inf')
+        start_tuple = self._state_to_tuple(start_state)
+        path_states = {start_tuple}
+        stack = [(start_tuple, 0, [], iter(actions))]
+
+        while stack:
+            state_tuple, cost, plan, remaining_actions = stack[-1]
+            action = next(remaining_actions, None)
+            if action is None:
+                stack.pop()
+                path_states.discard(state_tuple)
+                continue
+
+            current_state = dict(state_tuple)
+            if not self._is_applicable(action, current_state):
+                continue
+
+            new_state = self._apply_action(action, current_state, context)
+            new_tuple = self._state_to_tuple(new_state)
+            new_cost = cost + action.cost
+            new_depth = len(plan) + 1
+            if new_tuple in path_states:
+                continue
+
+            priority = new_cost + self._estimate(goals, new_state, context)
+            if priority > threshold:
+                next_threshold = min(next_threshold, priority)
+                continue
+
+            best_cost, best_depth = transposition_table.get(new_tuple, (float('inf'), float('inf')))
+            if best_cost <= new_cost and best_depth <= new_depth:
+                continue
+            if new_tuple in transposition_table or len(transposition_table) < self.transposition_table_size:
+                transposition_table[new_tuple] = (new_cost, new_depth)
+
+            if new_depth >= self.max_depth:
+                continue
+
+            self.node_developed += 1
+            new_plan = plan + [action.name]
+            if self._is_goal_satisfied(goals, new_state):
+                return new_plan, new_cost, next_threshold
+
+            path_states.add(new_tuple)
+            stack.append((new_tuple, new_cost, new_plan, iter(actions)))
+
+        return None, float('inf'), next_threshold
+
+    def _realtime_step(self, goals, start_state, context, actions, lookahead, goal_key):
+        """
+        Runs one step of the real-time search: a bounded A* lookahead from the current state, the
+        update of the learned heuristics of the expanded states, then the choice of the first action
+        toward the best node of the frontier.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            start_state (Dict): The current state, already updated.
+            context (Dict): Context dictionary for callbacks and additional information.
+            actions (List[Action]): The actions considered by the search.
+            lookahead (int): Max number of nodes expanded.
+            goal_key (Tuple): Hashable representation of the goals, used to store the learned heuristics.
+
+        Returns:
+            Tuple[Action, Dict]: The action to execute and the state predicted after it, or None if
+            no goal can be reached from the current state.
+        """
+        start_tuple = self._state_to_tuple(start_state)
+        costs = {start_tuple: 0}
+        parents = {}
+        expanded = []
+        frontier = [(self._learned_estimate(goals, start_tuple, context, goal_key), 0, 0, start_tuple)]
+        push_count = 1
+
+        goal_tuple = None
+        while frontier:
+            _, cost, _, state_tuple = frontier[0]
+            if cost > costs[state_tuple]:
+                heapq.heappop(frontier)
+                continue
+
+            if state_tuple != start_tuple and self._is_goal_satisfied(goals, dict(state_tuple)):
+                goal_tuple = state_tuple
+                break
+
+            if expanded and len(expanded) >= lookahead:
+                break
+
+            heapq.heappop(frontier)
+            self.node_developed += 1
+            expanded.append(state_tuple)
+            current_state = dict(state_tuple)
+            for action in actions:
+                if self._is_applicable(action, current_state):
+                    new_tuple = self._state_to_tuple(self._apply_action(action, current_state, context))
+                    new_cost = cost + action.cost
+                    if new_cost >= costs.get(new_tuple, float('inf')):
+                        continue
+
+                    costs[new_tuple] = new_cost
+                    parents[new_tuple] = (state_tuple, action)
+                    priority = new_cost + self._learned_estimate(goals, new_tuple, context, goal_key)
+                    heapq.heappush(frontier, (priority, new_cost, push_count, new_tuple))
+                    push_count += 1
+
+        if not frontier:
+            self._learn_heuristic((goal_key, start_tuple), float('inf'))
+            return None
+
+        best_priority, _, _, best_tuple = frontier[0]
+        for state_tuple in expanded:
+            key = (goal_key, state_tuple)
+            learned = best_priority - costs[state_tuple]
+            self._learn_heuristic(key, max(learned, self._learned_estimate(goals, state_tuple, context, goal_key)))
+
+        while parents[best_tuple][0] != start_tuple:
+            best_tuple = parents[best_tuple][0]
+
+        return parents[best_tuple][1], dict(best_tuple)
+
+    def _learn_heuristic(self, key, value):
+        """
+        Remembers a heuristic value learned by the real-time search. Once learned_heuristics_size values
+        are kept, only the known states are updated.
+
+        Args:
+            key (Tuple): The goals and state the value was learned for.
+            value (float): The learned heuristic value.
+        """
+        if key in self.learned_heuristics or len(self.learned_heuristics) < self.learned_heuristics_size:
+            self.learned_heuristics[key] = value
+
+    def _learned_estimate(self, goals, state_tuple, context, goal_key):
+        """
+        Gives the heuristic value of a state, using the value learned by the real-time search if any.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            state_tuple (Tuple): The hashable representation of the state.
+            context (Dict): Context dictionary for callbacks and additional information.
+            goal_key (Tuple): Hashable representation of the goals, used to find the learned heuristics.
+
+        Returns:
+            float: The heuristic value of the state.
+        """
+        key = (goal_key, state_tuple)
+        if key in self.learned_heuristics:
+            return self.learned_heuristics[key]
+
+        return self._estimate(goals, dict(state_tuple), context)
+
+    def _apply_action(self, action, state, context):
+        """
+        Creates the state resulting from applying an action, including the state update callback.
+
+        Args:
+            action (Action): The action to apply. It must be applicable in the state.
+            state (Dict): The state the action is applied to. It is not modified.
+            context (Dict): Context dictionary containing callbacks for updates.
+
+        Returns:
+            Dict: The new state.
+        """
+        self.action_tested += 1
+        new_state = state.copy()
+        for k, v in action.effects.items():
+            new_state[k] = self._clamp_value(k, new_state.get(k, 0) + v)
+
+        if "update_state_callback" in context:
+            context["update_state_callback"](new_state, context)
+
+        self._normalize_state(new_state)
+        return new_state
+
+    def _normalize_state(self, state):
+        """
+        Clamps the variables of a state to their bounds, then applies the value abstraction.
+
+        Args:
+            state (Dict): The state to normalize. It is modified in place.
+        """
+        for k in self.state_bounds:
+            if k in state:
+                state[k] = self._clamp_value(k, state[k])
+
+        for k in self.value_abstraction:
+            if k in state:
+                state[k] = self._abstract_value(k, state[k])
+
+    def _clamp_value(self, k, value):
+        """
+        Clamps the value of a variable to its bounds, if it has some.
+
+        Args:
+            k (str): The name of the variable.
+            value (int): The value to clamp.
+
+        Returns:
+            int: The clamped value.
+        """
+        if k not in self.state_bounds:
+            return value
+
+        lower_bound, upper_bound = self.state_bounds[k]
+        return max(lower_bound, min(upper_bound, value))
+
+    def _abstract_value(self, k, value):
+        """
+        Gives the abstract value of a variable: any value at or above the threshold becomes the threshold.
+
+        Args:
+            k (str): The name of the variable.
+            value (int): The value to abstract.
+
+        Returns:
+            int: The abstract value.
+        """
+        if k not in self.value_abstraction:
+            return value
+
+        return min(value, self.value_abstraction[k])
+
+    def _is_applicable(self, action, state):
+        """
+        Checks if an action can be applied in a state. With value abstraction, the preconditions are
+        abstracted the same way as the state, so a precondition above a threshold is met once the
+        threshold is reached.
+
+        Args:
+            action (Action): The action to check.
+            state (Dict): The normalized state to check.
+
+        Returns:
+            bool: True if all the preconditions are met.
+        """
+        if not self.value_abstraction:
+            return action.is_applicable(state)
+
+        return all(state.get(k, 0) >= self._abstract_value(k, v) for k, v in action.preconditions.items())
+
+    def _is_goal_satisfied(self, goals, state):
+        """
+        Checks if any goal is satisfied in a state. With value abstraction, the goal values are
+        abstracted the same way as the state, so a goal above a threshold is satisfied once the
+        threshold is reached.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            state (Dict): The normalized state to check.
+
+        Returns:
+            bool: True if at least one goal is satisfied.
+        """
+        if not self.value_abstraction:
+            return is_goal_satisfied(goals, state)
+
+        return any(all(state.get(k, 0) == self._abstract_value(k, v) for k, v in goal_info.goal_state.items())
+                   for goal_info in goals)
+
+    @staticmethod
+    def _estimate(goals, state, context):
+        """
+        Computes the smallest heuristic value among the goals. Goals without heuristic count as 0.
+
+        Args:
+            goals (List[Goal]): A list of goals with associated goal states and heuristics.
+            state (Dict): The state to evaluate.
+            context (Dict): Context dictionary for callbacks and additional information.
+
+        Returns:
+            float: The heuristic value of the state.
+        """
+        best = float('inf')
+        for goal_info in goals:
+            h = 0
+            if goal_info.heuristic is not None:
+                h = goal_info.heuristic(state, goal_info.goal_state, context)
+            best = min(best, h)
+
+        return best
+
     def display_usage_stats(self):
         """
         Display usage of the planner. We can see the number of plan requested. We see how many
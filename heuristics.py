@@ -0,0 +1,376 @@
+"""
+This module implements domain independent heuristics computed from the preconditions and effects
+of the actions, so a goal can get an informed search without writing domain specific code.
+
+The heuristics work on a relaxation of the problem where the negative side effects of the actions
+are ignored. A condition is an atom like "wood >= 3" (from a precondition) or "cooked_food == 1"
+(from a goal), and an action achieves an atom if its effect moves the variable in the right direction.
+The structures linking atoms and actions are built once per action set, and the values are cached
+for each evaluated state.
+
+Variables set by the update state callback can't be achieved by any action. When a callback is
+provided in the context, unreachable atoms are then considered free instead of being dead ends.
+"""
+
+import math
+from typing import List, Dict, Tuple
+
+from action import Action
+
+DEAD_END_COST = 10 ** 9
+
+GREATER_OR_EQUAL = ">="
+EQUAL = "=="
+
+
+class RelaxedPlanningHeuristic:
+    KINDS = ("h_max", "h_add", "ff")
+
+    def __init__(self, actions: List[Action], kind: str = "ff", cache_size: int = 100000):
+        """
+        Initializes the heuristic and precomputes the relaxation structures for the action set.
+
+        Args:
+            actions (List[Action]): The actions available to the planner.
+            kind (str): 'h_max' (admissible), 'h_add' or 'ff' (relaxed plan cost).
+            cache_size (int): Max number of evaluated states kept in the cache.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown heuristic kind: {kind}")
+
+        self.actions = actions
+        self.kind = kind
+        self.cache_size = cache_size
+        self.cache = {}
+        self.precondition_atoms = [[(k, GREATER_OR_EQUAL, v) for k, v in action.preconditions.items()]
+                                   for action in actions]
+        self.increasers, self.decreasers = _build_achievers(actions)
+
+    def __call__(self, state: Dict[str, int], goal_state: Dict[str, int], context: Dict) -> float:
+        """
+        Estimates the cost to reach the goal state from the state.
+
+        Args:
+            state (Dict[str, int]): The state to evaluate.
+            goal_state (Dict[str, int]): The desired goal state.
+            context (Dict): Additional context. Only the presence of a state update callback is used.
+
+        Returns:
+            float: The estimated cost, or DEAD_END_COST if the goal can't be reached.
+        """
+        has_callback = "update_state_callback" in context
+        key = (tuple(sorted(state.items())), tuple(sorted(goal_state.items())), has_callback)
+        if key in self.cache:
+            return self.cache[key]
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+
+        value = self._evaluate(state, goal_state, has_callback)
+        self.cache[key] = value
+        return value
+
+    def _evaluate(self, state, goal_state, has_callback):
+        """
+        Computes the heuristic value of a state without using the cache.
+
+        Args:
+            state (Dict[str, int]): The state to evaluate.
+            goal_state (Dict[str, int]): The desired goal state.
+            has_callback (bool): True if variables can be derived by the state update callback.
+
+        Returns:
+            float: The estimated cost, or DEAD_END_COST if the goal can't be reached.
+        """
+        action_costs = self._compute_action_costs(state, has_callback)
+        goal_atoms = [(k, EQUAL, v) for k, v in goal_state.items()]
+
+        if self.kind == "ff":
+            if any(self._atom_cost(atom, state, action_costs, has_callback) == float('inf') for atom in goal_atoms):
+                return DEAD_END_COST
+            return self._relaxed_plan_cost(goal_atoms, state, action_costs, has_callback)
+
+        value = self._aggregate(self._atom_cost(atom, state, action_costs, has_callback) for atom in goal_atoms)
+        return min(value, DEAD_END_COST)
+
+    def _aggregate(self, costs):
+        """
+        Combines the costs of several atoms: the max for h_max, the sum otherwise.
+
+        Args:
+            costs (Iterable[float]): The costs to combine.
+
+        Returns:
+            float: The combined cost.
+        """
+        if self.kind == "h_max":
+            return max(costs, default=0)
+        return sum(costs)
+
+    def _compute_action_costs(self, state, has_callback):
+        """
+        Computes, for each action, the relaxed cost to make its preconditions true. The costs are
+        updated until they don't change anymore.
+
+        Args:
+            state (Dict[str, int]): The state to evaluate.
+            has_callback (bool): True if variables can be derived by the state update callback.
+
+        Returns:
+            List[float]: The relaxed cost to reach the preconditions of each action.
+        """
+        action_costs = [float('inf')] * len(self.actions)
+        changed = True
+        while changed:
+            changed = False
+            for i, atoms in enumerate(self.precondition_atoms):
+                cost = self._aggregate(self._atom_cost(atom, state, action_costs, has_callback) for atom in atoms)
+                if cost < action_costs[i]:
+                    action_costs[i] = cost
+                    changed = True
+
+        return action_costs
+
+    def _atom_cost(self, atom, state, action_costs, has_callback):
+        """
+        Computes the relaxed cost to make an atom true from the state.
+
+        Args:
+            atom (Tuple[str, str, int]): The atom as (variable, operator, value).
+            state (Dict[str, int]): The state to evaluate.
+            action_costs (List[float]): The relaxed cost to reach the preconditions of each action.
+            has_callback (bool): True if variables can be derived by the state update callback.
+
+        Returns:
+            float: The cost to make the atom true, infinite if it can't be reached.
+        """
+        supporter = self._best_supporter(atom, state, action_costs)
+        if supporter is None:
+            if _is_atom_satisfied(atom, state):
+                return 0
+            return 0 if has_callback else float('inf')
+
+        _, cost = supporter
+        return cost
+
+    def _best_supporter(self, atom, state, action_costs):
+        """
+        Finds the cheapest action achieving an atom that is not already true.
+
+        Args:
+            atom (Tuple[str, str, int]): The atom as (variable, operator, value).
+            state (Dict[str, int]): The state to evaluate.
+            action_costs (List[float]): The relaxed cost to reach the preconditions of each action.
+
+        Returns:
+            Tuple[int, float]: The number of applications of the action and the cost to make the atom
+            true with it, or None if the atom is already true or can't be achieved.
+        """
+        achievers, deficit = _atom_achievers(atom, state, self.increasers, self.decreasers)
+        best = None
+        for i, gain in achievers:
+            if action_costs[i] == float('inf'):
+                continue
+
+            repetitions = 1 if self.kind == "h_max" else math.ceil(deficit / gain)
+            cost = action_costs[i] + repetitions * self.actions[i].cost
+            if best is None or cost < best[1]:
+                best = ((i, repetitions), cost)
+
+        return best
+
+    def _relaxed_plan_cost(self, goal_atoms, state, action_costs, has_callback):
+        """
+        Extracts a relaxed plan by going back from the goal atoms through their cheapest supporters,
+        and returns its cost. An action needed by several atoms is only counted once.
+
+        Args:
+            goal_atoms (List[Tuple[str, str, int]]): The atoms of the goal state.
+            state (Dict[str, int]): The state to evaluate.
+            action_costs (List[float]): The relaxed cost to reach the preconditions of each action.
+            has_callback (bool): True if variables can be derived by the state update callback.
+
+        Returns:
+            float: The cost of the relaxed plan.
+        """
+        relaxed_plan = {}
+        visited_atoms = set()
+        atoms_to_support = list(goal_atoms)
+        while atoms_to_support:
+            atom = atoms_to_support.pop()
+            if atom in visited_atoms:
+                continue
+            visited_atoms.add(atom)
+
+            supporter = self._best_supporter(atom, state, action_costs)
+            if supporter is None:
+                continue
+
+            (i, repetitions), _ = supporter
+            relaxed_plan[i] = max(relaxed_plan.get(i, 0), repetitions)
+            atoms_to_support.extend(self.precondition_atoms[i])
+
+        return sum(repetitions * self.actions[i].cost for i, repetitions in relaxed_plan.items())
+
+
+class LandmarkCountHeuristic:
+    def __init__(self, actions: List[Action], cache_size: int = 100000):
+        """
+        Initializes the heuristic and precomputes the landmarks of every precondition atom.
+        A landmark of an atom is an atom that must be true at some point before it. The
+        preconditions shared by all the actions achieving an atom are landmarks of that atom.
+
+        Args:
+            actions (List[Action]): The actions available to the planner.
+            cache_size (int): Max number of evaluated states kept in the cache.
+        """
+        self.actions = actions
+        self.cache_size = cache_size
+        self.cache = {}
+        self.increasers, self.decreasers = _build_achievers(actions)
+        self.precondition_landmarks = {}
+        for action in actions:
+            for k, v in action.preconditions.items():
+                self._landmarks_of((k, GREATER_OR_EQUAL, v), self.increasers.get(k, []), set())
+
+    def __call__(self, state: Dict[str, int], goal_state: Dict[str, int], context: Dict) -> float:
+        """
+        Counts the landmarks of the goal state that are not true in the state.
+
+        Args:
+            state (Dict[str, int]): The state to evaluate.
+            goal_state (Dict[str, int]): The desired goal state.
+            context (Dict): Additional context. Not used.
+
+        Returns:
+            float: The number of landmarks left to reach.
+        """
+        key = (tuple(sorted(state.items())), tuple(sorted(goal_state.items())))
+        if key in self.cache:
+            return self.cache[key]
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+
+        landmarks = set()
+        for k, v in goal_state.items():
+            atom = (k, EQUAL, v)
+            achievers, _ = _atom_achievers(atom, state, self.increasers, self.decreasers)
+            landmarks.add(atom)
+            landmarks.update(self._landmarks_of(atom, achievers, set()))
+
+        value = sum(1 for atom in landmarks if not _is_atom_satisfied(atom, state))
+        self.cache[key] = value
+        return value
+
+    def _landmarks_of(self, atom, achievers, in_progress):
+        """
+        Computes the landmarks of an atom from the preconditions shared by all its achievers.
+
+        Args:
+            atom (Tuple[str, str, int]): The atom as (variable, operator, value).
+            achievers (List[Tuple[int, int]]): The actions achieving the atom, with their gain.
+            in_progress (Set): The atoms being computed higher in the recursion, to stop cycles.
+
+        Returns:
+            Set: The landmarks of the atom, without the atom itself.
+        """
+        if atom in self.precondition_landmarks:
+            return self.precondition_landmarks[atom]
+        if not achievers or atom in in_progress:
+            return set()
+
+        in_progress.add(atom)
+        shared_preconditions = None
+        for i, _ in achievers:
+            preconditions = {(k, GREATER_OR_EQUAL, v) for k, v in self.actions[i].preconditions.items()}
+            shared_preconditions = preconditions if shared_preconditions is None \
+                else shared_preconditions & preconditions
+
+        landmarks = set(shared_preconditions)
+        for landmark in shared_preconditions:
+            landmarks.update(self._landmarks_of(landmark, self.increasers.get(landmark[0], []), in_progress))
+        in_progress.discard(atom)
+
+        if atom[1] == GREATER_OR_EQUAL:
+            self.precondition_landmarks[atom] = landmarks
+        return landmarks
+
+
+def build_heuristic(name: str, actions: List[Action]):
+    """
+    Creates a built-in heuristic from its name.
+
+    Args:
+        name (str): 'h_max', 'h_add', 'ff' or 'landmarks'.
+        actions (List[Action]): The actions available to the planner.
+
+    Returns:
+        Callable[[Dict[str, int], Dict[str, int], Dict], float]: The heuristic, usable in a Goal.
+    """
+    if name == "landmarks":
+        return LandmarkCountHeuristic(actions)
+    return RelaxedPlanningHeuristic(actions, name)
+
+
+def _build_achievers(actions: List[Action]) -> Tuple[Dict[str, List], Dict[str, List]]:
+    """
+    Lists, for each variable, the actions increasing it and the actions decreasing it.
+
+    Args:
+        actions (List[Action]): The actions available to the planner.
+
+    Returns:
+        Tuple[Dict[str, List], Dict[str, List]]: For each variable, the (action index, gain) of the actions
+        increasing it and of the actions decreasing it.
+    """
+    increasers = {}
+    decreasers = {}
+    for i, action in enumerate(actions):
+        for k, v in action.effects.items():
+            if v > 0:
+                increasers.setdefault(k, []).append((i, v))
+            elif v < 0:
+                decreasers.setdefault(k, []).append((i, -v))
+
+    return increasers, decreasers
+
+
+def _atom_achievers(atom, state, increasers, decreasers):
+    """
+    Finds the actions that move the variable of an atom toward its value.
+
+    Args:
+        atom (Tuple[str, str, int]): The atom as (variable, operator, value).
+        state (Dict[str, int]): The state to evaluate.
+        increasers (Dict[str, List]): The (action index, gain) of the actions increasing each variable.
+        decreasers (Dict[str, List]): The (action index, gain) of the actions decreasing each variable.
+
+    Returns:
+        Tuple[List[Tuple[int, int]], int]: The achievers with their gain and how far the variable is from
+        the value. No achievers are returned if the atom is already true.
+    """
+    k, _, v = atom
+    current_value = state.get(k, 0)
+    if _is_atom_satisfied(atom, state):
+        return [], 0
+    if current_value < v:
+        return increasers.get(k, []), v - current_value
+    return decreasers.get(k, []), current_value - v
+
+
+def _is_atom_satisfied(atom, state) -> bool:
+    """
+    Checks if an atom is true in the state.
+
+    Args:
+        atom (Tuple[str, str, int]): The atom as (variable, operator, value).
+        state (Dict[str, int]): The state to evaluate.
+
+    Returns:
+        bool: True if the atom is true.
+    """
+    k, operator, v = atom
+    if operator == GREATER_OR_EQUAL:
+        return state.get(k, 0) >= v
+    return state.get(k, 0) == v
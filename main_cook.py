@@ -1,17 +1,18 @@
 """
 This script sets up and runs a cooking experiment using the GOAP (Goal-Oriented Action Planning) system.
 It allows the user to run the experiment in two modes: 'plan' (generates and displays the plan)
-and 'execute' (executes the plan with dynamic updates via an event thread).
+and 'execute' (executes the plan with dynamic updates via periodic events). The execution can run
+in real time or on a simulated clock, which runs as fast as possible with a reproducible ordering.
 """
 
 import argparse
-import threading
-import time
 from action import Action
 from agent import Agent
 from event_manager import EventManager
 from goal import Goal
 from goap_planner import GOAPPlanner
+from heuristics import build_heuristic
+from simulation import SimulationClock
 
 actions = [
     Action("Gather Wood", {"wood": 0}, {"wood": 5}, duration=1, cost=1),
@@ -20,13 +21,15 @@ actions = [
 ]
 
 
-def main(mode, use_heuristic):
+def main(mode, use_heuristic, clock_type="real"):
     """
     Main function to handle the cooking experiment based on the selected mode.
 
     Args:
         mode (str): The mode to run ('plan' to generate and display the plan, 'execute' to run the plan with dynamic events).
         use_heuristic (str): 'enabled' to enable the use of heuristic to generate the plan, 'disabled' to not use it.
+                             'h_max', 'h_add', 'ff' or 'landmarks' to use a heuristic computed from the actions.
+        clock_type (str): 'real' to execute in real time, 'simulated' to execute on a simulated clock.
     """
     initial_state = {"wood": 0, "fire": 0, "cooked_food": 0}
     goal_state = {"cooked_food": 1}
@@ -34,40 +37,40 @@ def main(mode, use_heuristic):
     heuristic = None
     if use_heuristic == "enabled":
         heuristic = lambda state, goal, context: sum(abs(state.get(k, 0) - v) for k, v in goal.items())
+    elif use_heuristic != "disabled":
+        heuristic = build_heuristic(use_heuristic, actions)
     goal = Goal(goal_state, heuristic)
 
-    planner = GOAPPlanner(actions)
+    planner = GOAPPlanner(actions, value_abstraction={"wood": 5, "fire": 1})
     plan, total_cost = planner.plan(initial_state, goal, {})
 
     if mode == "plan":
         print(f"Generated Plan: {plan} with total cost: {total_cost}")
         return
 
-    event_manager = EventManager()
+    clock = SimulationClock() if clock_type == "simulated" else None
+    event_manager = EventManager(clock)
+    agent = Agent(actions, planner, event_manager, verbose=True, clock=clock)
 
-    def event_thread():
-        """
-        Simulates dynamic events by periodically publishing events through the event manager.
-        """
-        while True:
-            time.sleep(5)
-            event_manager.publish_event()
-
-    agent = Agent(actions, planner, event_manager, verbose=True)
-
-    event_thread_obj = threading.Thread(target=event_thread, daemon=True)
-    event_thread_obj.start()
+    # Simulates dynamic events by notifying the agent every 5 seconds.
+    event_manager.schedule_notify(5, period=5)
 
     agent.execute_plan(initial_state, plan, {"goals": goal})
     planner.display_usage_stats()
 
+    if clock is not None:
+        print(f"Simulated time: {clock.now()}s")
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Cooking Experiment")
     parser.add_argument("--mode", choices=["plan", "execute"], default="plan",
                         help="Choose whether to plan or execute the experiment")
-    parser.add_argument("--heuristic", choices=["enabled", "disabled"], default="enabled",
-                        help="Choose whether to enable heuristic or not.")
+    parser.add_argument("--heuristic", choices=["enabled", "disabled", "h_max", "h_add", "ff", "landmarks"],
+                        default="enabled",
+                        help="Choose whether to enable heuristic or not, or which heuristic computed from the actions to use.")
+    parser.add_argument("--clock", choices=["real", "simulated"], default="real",
+                        help="Choose whether to execute in real time or on a simulated clock.")
     args = parser.parse_args()
 
-    main(args.mode, args.heuristic)
+    main(args.mode, args.heuristic, args.clock)
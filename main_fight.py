@@ -1,7 +1,9 @@
 """
 This script sets up and runs a fighting experiment using the GOAP (Goal-Oriented Action Planning) system.
-It allows the user to run the experiment in two modes: 'plan' (generates and displays the plan) 
-and 'execute' (executes the plan with dynamic updates via opponent actions).
+It allows the user to run the experiment in three modes: 'plan' (generates and displays the plan),
+'execute' (executes the plan with dynamic updates via opponent actions) and 'realtime' (same as
+execute, but actions start as soon as the real-time search commits to them). The execution can run
+in real time or on a simulated clock, which runs as fast as possible with a reproducible ordering.
 """
 
 import argparse
@@ -13,6 +15,9 @@ from agent import Agent
 from event_manager import EventManager
 from goal import Goal
 from goap_planner import GOAPPlanner
+from search_trace import SearchTrace
+from heuristics import build_heuristic
+from simulation import SimulationClock
 from typing import Dict
 
 
@@ -37,16 +42,20 @@ class Opponent:
         self.current_action_index = 0
         self.move_direction = 1
 
-    def perform_action(self):
+    def perform_action(self) -> int:
         """
         Executes the current action of the opponent, which could be waiting or moving.
+
+        Returns:
+            int: The time (in seconds) the opponent waits before its next action.
         """
+        wait_duration = 0
         if self.health > 0:
             if self.current_action_index < len(self.actions):
                 action, duration = self.actions[self.current_action_index]
                 if action == "Wait":
                     print(f"{self.name} is waiting for {duration} turn(s).")
-                    time.sleep(duration)
+                    wait_duration = duration
                     self.current_action_index += 1
                 elif action == "Move":
                     self.move()
@@ -56,6 +65,8 @@ class Opponent:
             self.current_action_index = 0
             self.prepare_next_move()
 
+        return wait_duration
+
     def move(self):
         """
         Moves the opponent in the specified direction (either vertical or horizontal), 
@@ -196,27 +207,52 @@ def opponent_thread():
     """
     while True:
         for opponent in opponents:
-            opponent.perform_action()
+            time.sleep(opponent.perform_action())
             time.sleep(1)
 
 
-def main(mode, use_heuristic):
+def schedule_opponent_action(clock: SimulationClock, opponent_index: int = 0):
+    """
+    Performs the action of one opponent and schedules the next opponent on the simulated clock.
+    This follows the same ordering and delays as the opponent thread.
+
+    Args:
+        clock (SimulationClock): The simulated clock used to schedule the opponent actions.
+        opponent_index (int): The index of the opponent performing its action.
+    """
+    wait_duration = opponents[opponent_index].perform_action()
+    next_index = (opponent_index + 1) % len(opponents)
+    clock.schedule(wait_duration + 1, schedule_opponent_action, clock, next_index)
+
+
+def main(mode, use_heuristic, clock_type="real", trace_path=None):
     """
     Main function to handle the fighting experiment based on the selected mode.
 
     Args:
-        mode (str): The mode to run ('plan' to generate and display the plan, 'execute' to run the plan with opponent actions).
+        mode (str): The mode to run ('plan' to generate and display the plan, 'execute' to run the plan with opponent actions,
+                    'realtime' to run with opponent actions while searching one action at a time).
         use_heuristic (str): 'enabled' to enable the use of heuristic to generate the plan, 'disabled' to not use it.
+                             'h_max', 'h_add', 'ff' or 'landmarks' to use a heuristic computed from the actions,
+                             which gives almost no information here since the goal variables are derived by the callback.
+        clock_type (str): 'real' to execute in real time, 'simulated' to execute on a simulated clock.
+        trace_path (str): If provided, the search is traced and the trace is saved to this path.
     """
     goal_state = {f"enemy_health_{i}": 0 for i in range(len(opponents))}
     heuristic = None
     if use_heuristic == "enabled":
         heuristic = fight_heuristic
+    elif use_heuristic != "disabled":
+        heuristic = build_heuristic(use_heuristic, actions)
     goal = Goal(goal_state, heuristic)
     
     fight_context = {
         "enemies": opponents,
         "update_state_callback": update_fight_state,
+        "derived_dependencies": {
+            "in_range": ["x", "y"],
+            **{f"enemy_health_{i}": ["x", "y", "damage_dealt"] for i in range(len(opponents))}
+        },
         "post_action_callback": update_enemy_health,
         "goals": goal,
         "verbose": True
@@ -224,28 +260,53 @@ def main(mode, use_heuristic):
 
     fighter_initial_state = {"x": 0, "y": 0, "stamina": 20, "health": 100, "blocking": 0, "in_range": 0, "damage_dealt": 0}
 
-    planner = GOAPPlanner(actions)
-    plan, total_cost = planner.plan(fighter_initial_state, goal, fight_context)
-
-    if mode == "plan":
-        print(f"Generated Plan: {plan} with total cost: {total_cost}")
-        return
-
-    opponent_thread_obj = threading.Thread(target=opponent_thread, daemon=True)
-    opponent_thread_obj.start()
-
-    event_manager = EventManager()
-    fighter = Agent(actions, planner, event_manager, verbose=True)
-    fighter.execute_plan(fighter_initial_state, plan, fight_context)
+    trace = SearchTrace() if trace_path else None
+    planner = GOAPPlanner(actions, state_bounds={"x": (0, 9), "y": (0, 9), "blocking": (0, 1)},
+                          value_abstraction={"stamina": 40}, trace=trace)
+    if mode != "realtime":
+        plan, total_cost = planner.plan(fighter_initial_state, goal, fight_context)
+
+        if mode == "plan":
+            print(f"Generated Plan: {plan} with total cost: {total_cost}")
+            if trace is not None:
+                trace.save(trace_path)
+            return
+
+    clock = None
+    if clock_type == "simulated":
+        clock = SimulationClock()
+        clock.schedule(0, schedule_opponent_action, clock)
+    else:
+        opponent_thread_obj = threading.Thread(target=opponent_thread, daemon=True)
+        opponent_thread_obj.start()
+
+    event_manager = EventManager(clock)
+    fighter = Agent(actions, planner, event_manager, verbose=True, clock=clock)
+    if mode == "realtime":
+        fighter.execute_realtime(fighter_initial_state, fight_context)
+    else:
+        fighter.execute_plan(fighter_initial_state, plan, fight_context)
     planner.display_usage_stats()
+    if trace is not None:
+        trace.save(trace_path)
+
+    if clock is not None:
+        print(f"Simulated time: {clock.now()}s")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fighting Experiment")
-    parser.add_argument("--mode", choices=["plan", "execute"], default="plan",
+    parser.add_argument("--mode", choices=["plan", "execute", "realtime"], default="plan",
                         help="Choose whether to plan or execute the experiment")
-    parser.add_argument("--heuristic", choices=["enabled", "disabled"], default="enabled",
-                        help="Choose whether to enable heuristic or not.")
+    parser.add_argument("--heuristic", choices=["enabled", "disabled", "h_max", "h_add", "ff", "landmarks"],
+                        default="enabled",
+                        help="Choose whether to enable heuristic or not, or which heuristic computed from the actions to use. "
+                             "The enemy health is derived by the state update callback, so the heuristics computed "
+                             "from the actions give almost no information here and search like disabled.")
+    parser.add_argument("--clock", choices=["real", "simulated"], default="real",
+                        help="Choose whether to execute in real time or on a simulated clock.")
+    parser.add_argument("--trace", default=None,
+                        help="Path where to save a trace of the search, to replay it with replay_trace.py.")
     args = parser.parse_args()
 
-    main(args.mode, args.heuristic)
+    main(args.mode, args.heuristic, args.clock, args.trace)
@@ -15,6 +15,7 @@ from agent import Agent
 from event_manager import EventManager
 from goal import Goal
 from goap_planner import GOAPPlanner, PlanningMode
+from heuristics import build_heuristic
 
 actions = [
     Action(name="ActionA", preconditions={}, effects={"condition_x": 1}, cost=100, duration=10),
@@ -23,16 +24,24 @@ actions = [
 ]
 
 
-def main():
+def main(use_heuristic):
     """
     Main function to handle the multi goals experiments based on the selected mode.
+
+    Args:
+        use_heuristic (str): 'disabled' to not use heuristic, 'h_max', 'h_add', 'ff' or 'landmarks'
+                             to use a heuristic computed from the actions.
     """
     initial_state = {}
 
+    heuristic = None
+    if use_heuristic != "disabled":
+        heuristic = build_heuristic(use_heuristic, actions)
+
     goals = [
-        Goal(goal_state={"impossible_condition": 1}, heuristic=None),
-        Goal(goal_state={"condition_y": 1}, heuristic=None),
-        Goal(goal_state={"condition_z": 1}, heuristic=None)
+        Goal(goal_state={"impossible_condition": 1}, heuristic=heuristic),
+        Goal(goal_state={"condition_y": 1}, heuristic=heuristic),
+        Goal(goal_state={"condition_z": 1}, heuristic=heuristic)
     ]
 
     planner = GOAPPlanner(actions)
@@ -48,6 +57,8 @@ def main():
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Multi Goals Experiment")
+    parser.add_argument("--heuristic", choices=["disabled", "h_max", "h_add", "ff", "landmarks"], default="disabled",
+                        help="Choose which heuristic computed from the actions to use, if any.")
     args = parser.parse_args()
 
-    main()
+    main(args.heuristic)
@@ -0,0 +1,263 @@
+"""
+This module implements a hash distributed A* search (HDA*) used by the GOAPPlanner to solve a
+single planning problem on several cores. Each state is owned by one worker process, chosen by
+hashing the state. A worker keeps its own open and closed lists, expands its best node and sends
+the successors to their owner through batched queues. The search stops once no worker has a node
+that could lead to a cheaper plan and no batch is in flight, so the returned plan is optimal when
+the heuristics are admissible.
+
+The workers are started with the fork start method when the platform supports it, so the
+context callbacks and heuristics don't need to be picklable. Otherwise they must be.
+"""
+
+import heapq
+import multiprocessing
+import queue
+import time
+import zlib
+from typing import List, Dict, Tuple
+
+from action import Action
+
+IDLE_WAIT = 0.005
+INBOX_CHECK_INTERVAL = 16
+
+
+def state_owner(state_tuple: Tuple, num_workers: int) -> int:
+    """
+    Finds the worker owning a state. The hash must be the same in every process, so the
+    randomized built-in string hash can't be used.
+
+    Args:
+        state_tuple (Tuple): The hashable representation of the state.
+        num_workers (int): The number of worker processes.
+
+    Returns:
+        int: The index of the worker owning the state.
+    """
+    return zlib.crc32(repr(state_tuple).encode()) % num_workers
+
+
+def plan_hash_distributed(planner, goals, start_state: Dict[str, int], context: Dict, actions: List[Action],
+                          num_workers: int, batch_size: int = 32) -> Tuple[List[str], float]:
+    """
+    Generates a plan for the provided goals by distributing the A* search over worker processes.
+
+    Args:
+        planner (GOAPPlanner): The planner holding the actions and the search settings.
+        goals (List[Goal]): A list of goals with associated goal states and heuristics.
+        start_state (Dict[str, int]): The already updated starting state.
+        context (Dict): Context dictionary for callbacks and additional information.
+        actions (List[Action]): The actions considered by the search.
+        num_workers (int): The number of worker processes.
+        batch_size (int): Number of successors buffered before they are sent to their owner.
+
+    Returns:
+        Tuple[List[str], float]: A tuple containing the list of actions in the plan and the total cost.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = multiprocessing.get_context()
+
+    inboxes = [mp_context.Queue() for _ in range(num_workers)]
+    results = mp_context.Queue()
+    incumbent = mp_context.Value('d', float('inf'))
+    sent = mp_context.Value('q', 0)
+    received = mp_context.Value('q', 0)
+    idle = mp_context.Array('b', num_workers)
+    stop_event = mp_context.Event()
+
+    workers = [mp_context.Process(target=_search_worker,
+                                  args=(worker_id, planner, goals, context, actions, inboxes, results, incumbent,
+                                        sent, received, idle, stop_event, batch_size),
+                                  daemon=True)
+               for worker_id in range(num_workers)]
+    for worker in workers:
+        worker.start()
+
+    start_tuple = planner._state_to_tuple(start_state)
+    with sent.get_lock():
+        sent.value += 1
+    inboxes[state_owner(start_tuple, num_workers)].put([(0, 0, start_tuple, [])])
+
+    best_plan, best_cost = [], float('inf')
+    stats_received = 0
+    while not _is_search_over(sent, received, idle):
+        best_plan, best_cost, stats_received = _collect_results(planner, results, best_plan, best_cost,
+                                                                stats_received)
+        if any(not worker.is_alive() for worker in workers):
+            stop_event.set()
+            raise Exception("A planning worker stopped unexpectedly.")
+        time.sleep(IDLE_WAIT)
+
+    stop_event.set()
+    while stats_received < num_workers:
+        best_plan, best_cost, stats_received = _collect_results(planner, results, best_plan, best_cost,
+                                                                stats_received, block=True)
+    for worker in workers:
+        worker.join()
+
+    return best_plan, best_cost
+
+
+def _is_search_over(sent, received, idle) -> bool:
+    """
+    Checks if every worker is idle and no batch is in flight. The counters are read before and after
+    the idle flags: a worker can only become active by receiving a batch, which changes the counters.
+
+    Args:
+        sent (Value): Number of nodes sent to the workers.
+        received (Value): Number of nodes received by the workers.
+        idle (Array): Flag for each worker telling if it has nothing left to expand.
+
+    Returns:
+        bool: True if the search is over.
+    """
+    sent_before, received_before = sent.value, received.value
+    if sent_before != received_before or not all(idle):
+        return False
+
+    return sent.value == sent_before and received.value == received_before
+
+
+def _collect_results(planner, results, best_plan, best_cost, stats_received, block=False):
+    """
+    Reads the messages sent by the workers: the plans they found and their usage stats.
+
+    Args:
+        planner (GOAPPlanner): The planner receiving the usage stats.
+        results (Queue): The queue where the workers send their messages.
+        best_plan (List[str]): The cheapest plan received so far.
+        best_cost (float): The cost of the cheapest plan received so far.
+        stats_received (int): The number of workers that already sent their stats.
+        block (bool): If True, waits for at least one message.
+
+    Returns:
+        Tuple[List[str], float, int]: The updated best plan, best cost and stats received.
+    """
+    while True:
+        try:
+            message = results.get(timeout=IDLE_WAIT) if block else results.get_nowait()
+        except queue.Empty:
+            return best_plan, best_cost, stats_received
+
+        block = False
+        if message[0] == "plan":
+            _, cost, plan = message
+            if cost < best_cost:
+                best_plan, best_cost = plan, cost
+        elif message[0] == "stats":
+            _, node_developed, action_tested = message
+            planner.node_developed += node_developed
+            planner.action_tested += action_tested
+            stats_received += 1
+
+
+def _search_worker(worker_id, planner, goals, context, actions, inboxes, results, incumbent, sent, received, idle,
+                   stop_event, batch_size):
+    """
+    Runs the search for the states owned by one worker until the search is stopped.
+
+    Args:
+        worker_id (int): The index of this worker.
+        planner (GOAPPlanner): The planner holding the actions and the search settings.
+        goals (List[Goal]): A list of goals with associated goal states and heuristics.
+        context (Dict): Context dictionary for callbacks and additional information.
+        actions (List[Action]): The actions considered by the search.
+        inboxes (List[Queue]): The queue of every worker, where the batches of nodes are sent.
+        results (Queue): The queue where the plans found and the usage stats are sent.
+        incumbent (Value): The cost of the cheapest plan found by any worker.
+        sent (Value): Number of nodes sent to the workers.
+        received (Value): Number of nodes received by the workers.
+        idle (Array): Flag for each worker telling if it has nothing left to expand.
+        stop_event (Event): Set once the search is over.
+        batch_size (int): Number of successors buffered before they are sent to their owner.
+    """
+    num_workers = len(inboxes)
+    inbox = inboxes[worker_id]
+    node_developed, action_tested = planner.node_developed, planner.action_tested
+
+    open_list = []
+    best_nodes = {}
+    outgoing = [[] for _ in range(num_workers)]
+    push_count = 0
+    expansions = 0
+
+    def add_nodes(nodes):
+        nonlocal push_count
+        for cost, elapsed_time, state_tuple, plan in nodes:
+            # A costlier copy with a shorter plan must be kept, since it can go deeper before max_depth.
+            best_cost, best_depth = best_nodes.get(state_tuple, (float('inf'), float('inf')))
+            if best_cost <= cost and best_depth <= len(plan):
+                continue
+            priority = cost + planner._estimate(goals, dict(state_tuple), context)
+            if priority >= incumbent.value:
+                continue
+            best_nodes[state_tuple] = (cost, len(plan))
+            heapq.heappush(open_list, (priority, cost, elapsed_time, len(plan), push_count, state_tuple, plan))
+            push_count += 1
+
+    def send(owner):
+        with sent.get_lock():
+            sent.value += len(outgoing[owner])
+        inboxes[owner].put(outgoing[owner])
+        outgoing[owner] = []
+
+    def receive(batch):
+        idle[worker_id] = 0
+        with received.get_lock():
+            received.value += len(batch)
+        add_nodes(batch)
+
+    while not stop_event.is_set():
+        if not open_list or open_list[0][0] >= incumbent.value:
+            for owner in range(num_workers):
+                if outgoing[owner]:
+                    send(owner)
+            idle[worker_id] = 1
+            try:
+                receive(inbox.get(timeout=IDLE_WAIT))
+            except queue.Empty:
+                pass
+            continue
+
+        expansions += 1
+        if expansions % INBOX_CHECK_INTERVAL == 0:
+            try:
+                while True:
+                    receive(inbox.get_nowait())
+            except queue.Empty:
+                pass
+
+        _, cost, elapsed_time, depth, _, state_tuple, plan = heapq.heappop(open_list)
+        best_cost, best_depth = best_nodes[state_tuple]
+        if (best_cost, best_depth) != (cost, depth) and best_cost <= cost and best_depth <= depth:
+            continue
+        if depth >= planner.max_depth:
+            continue
+
+        planner.node_developed += 1
+        current_state = dict(state_tuple)
+        if planner._is_goal_satisfied(goals, current_state):
+            with incumbent.get_lock():
+                if cost < incumbent.value:
+                    incumbent.value = cost
+                    results.put(("plan", cost, plan))
+            continue
+
+        for action in actions:
+            if planner._is_applicable(action, current_state):
+                new_state = planner._apply_action(action, current_state, context)
+                new_tuple = planner._state_to_tuple(new_state)
+                new_node = (cost + action.cost, elapsed_time + action.duration, new_tuple, plan + [action.name])
+
+                owner = state_owner(new_tuple, num_workers)
+                if owner == worker_id:
+                    add_nodes([new_node])
+                else:
+                    outgoing[owner].append(new_node)
+                    if len(outgoing[owner]) >= batch_size:
+                        send(owner)
+
+    results.put(("stats", planner.node_developed - node_developed, planner.action_tested - action_tested))
@@ -0,0 +1,73 @@
+"""
+This script replays a search trace saved by the GOAPPlanner (see SearchTrace.save). It rebuilds
+the search tree offline, prints a summary with the expansions per action, and can export the
+trace to the Chrome trace format or to speedscope to look at it as a flamegraph.
+"""
+
+import argparse
+import json
+
+from search_trace import SearchTrace, EXPAND, GOAL, PUSH
+
+
+def tree_depth(children, node_id=-1) -> int:
+    """
+    Computes the depth of the rebuilt search tree.
+
+    Args:
+        children (Dict[int, List[int]]): The children ids of each node id.
+        node_id (int): The node to start from, -1 for the root.
+
+    Returns:
+        int: The number of levels below the node.
+    """
+    depth = 0
+    nodes_to_visit = [(node_id, 0)]
+    while nodes_to_visit:
+        node_id, level = nodes_to_visit.pop()
+        depth = max(depth, level)
+        nodes_to_visit.extend((child, level + 1) for child in children.get(node_id, []))
+
+    return max(depth - 1, 0)
+
+
+def main(trace_path, chrome_path, speedscope_path):
+    """
+    Main function to replay a saved trace.
+
+    Args:
+        trace_path (str): The path of the trace saved with SearchTrace.save.
+        chrome_path (str): If provided, where to export the trace in the Chrome trace format.
+        speedscope_path (str): If provided, where to export the trace in the speedscope format.
+    """
+    trace = SearchTrace.load(trace_path)
+    children = trace.build_tree()
+
+    events = [record[0] for record in trace.records]
+    print("Nodes pushed: ", events.count(PUSH))
+    print("Nodes expanded: ", events.count(EXPAND))
+    print("Goals found: ", events.count(GOAL))
+    print("Tree depth: ", tree_depth(children))
+    print("Expansions per action:")
+    for action_name, count in sorted(trace.expansion_histogram().items(), key=lambda item: -item[1]):
+        print(f"  {action_name}: {count}")
+
+    if chrome_path:
+        with open(chrome_path, "w") as file:
+            json.dump(trace.to_chrome_trace(), file)
+        print(f"Chrome trace written to {chrome_path}")
+
+    if speedscope_path:
+        with open(speedscope_path, "w") as file:
+            json.dump(trace.to_speedscope(), file)
+        print(f"Speedscope profile written to {speedscope_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search Trace Replay")
+    parser.add_argument("trace", help="Path of the trace saved by the planner")
+    parser.add_argument("--chrome", default=None, help="Path where to export the Chrome trace")
+    parser.add_argument("--speedscope", default=None, help="Path where to export the speedscope profile")
+    args = parser.parse_args()
+
+    main(args.trace, args.chrome, args.speedscope)
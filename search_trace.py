@@ -0,0 +1,186 @@
+"""
+This module implements the SearchTrace class, which records what the GOAPPlanner does while searching:
+each node pushed in the frontier and each node expanded. The records are kept in a ring buffer, so
+only the most recent ones are kept when the capacity is reached. A trace can be exported to the
+Chrome trace format (chrome://tracing, Perfetto), to the speedscope format to see a flamegraph of the
+expansions by action path, or to a per-action expansion histogram. It can also be saved and loaded
+to rebuild the search tree offline (see replay_trace.py).
+"""
+
+import json
+import time
+from collections import deque, Counter
+from typing import List, Dict
+
+PUSH = "push"
+EXPAND = "expand"
+GOAL = "goal"
+
+ROOT_NAME = "start"
+
+
+class SearchTrace:
+    def __init__(self, capacity: int = 100000):
+        """
+        Initializes an empty trace.
+
+        Args:
+            capacity (int): Max number of records kept. The oldest records are dropped first.
+        """
+        self.records = deque(maxlen=capacity)
+        self.next_node_id = 0
+        self.start_time = time.perf_counter_ns()
+
+    def new_node_id(self) -> int:
+        """
+        Gives a new unique node id.
+
+        Returns:
+            int: The node id.
+        """
+        node_id = self.next_node_id
+        self.next_node_id += 1
+        return node_id
+
+    def record(self, event: str, node_id: int, parent_id: int, action_name: str, g: float, h: float, goal_index: int):
+        """
+        Records an event of the search.
+
+        Args:
+            event (str): PUSH, EXPAND or GOAL.
+            node_id (int): The id of the node.
+            parent_id (int): The id of the parent node, -1 for the root.
+            action_name (str): The action leading to the node, None for the root.
+            g (float): The cost to reach the node.
+            h (float): The heuristic value of the node.
+            goal_index (int): The index of the goal the node was pushed for, -1 if none.
+        """
+        self.records.append((event, node_id, parent_id, action_name, g, h, goal_index,
+                             time.perf_counter_ns() - self.start_time))
+
+    def expansion_histogram(self) -> Dict[str, int]:
+        """
+        Counts the expansions of the nodes reached by each action.
+
+        Returns:
+            Dict[str, int]: The number of expansions for each action name.
+        """
+        return dict(Counter(action_name or ROOT_NAME for event, _, _, action_name, *_ in self.records
+                            if event == EXPAND))
+
+    def build_tree(self) -> Dict[int, List[int]]:
+        """
+        Rebuilds the search tree from the push records. Nodes whose parent is not in the trace anymore
+        are attached to the root (-1).
+
+        Returns:
+            Dict[int, List[int]]: The children ids of each node id.
+        """
+        known_nodes = {node_id for event, node_id, *_ in self.records if event == PUSH}
+        children = {}
+        for event, node_id, parent_id, *_ in self.records:
+            if event == PUSH:
+                parent_id = parent_id if parent_id in known_nodes else -1
+                children.setdefault(parent_id, []).append(node_id)
+
+        return children
+
+    def to_chrome_trace(self) -> Dict:
+        """
+        Exports the trace to the Chrome trace event format. Each expansion is a slice lasting until
+        the next expansion, on one row per goal. The pushes and goals found are instant events.
+
+        Returns:
+            Dict: The trace, ready to be saved as JSON.
+        """
+        trace_events = []
+        last_expansion = None
+        for event, node_id, parent_id, action_name, g, h, goal_index, timestamp in self.records:
+            timestamp_us = timestamp / 1000
+            trace_event = {"name": action_name or ROOT_NAME, "cat": event, "ts": timestamp_us, "pid": 0,
+                           "tid": goal_index, "args": {"node": node_id, "parent": parent_id, "g": g, "h": h}}
+            if event == EXPAND:
+                if last_expansion is not None:
+                    last_expansion["dur"] = timestamp_us - last_expansion["ts"]
+                trace_event.update({"ph": "X", "dur": 0})
+                last_expansion = trace_event
+            else:
+                trace_event.update({"ph": "i", "s": "t"})
+            trace_events.append(trace_event)
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def to_speedscope(self) -> Dict:
+        """
+        Exports the trace to the speedscope format. Each expansion is a sample whose stack is the
+        list of actions leading to the expanded node, so the flamegraph shows which subtrees used
+        the expansions.
+
+        Returns:
+            Dict: The profile, ready to be saved as JSON.
+        """
+        nodes = {node_id: (parent_id, action_name) for event, node_id, parent_id, action_name, *_ in self.records
+                 if event == PUSH}
+        frames = []
+        frame_indices = {}
+        samples = []
+        for event, node_id, *_ in self.records:
+            if event != EXPAND:
+                continue
+
+            stack = []
+            while node_id in nodes:
+                node_id, action_name = nodes[node_id]
+                stack.append(action_name or ROOT_NAME)
+            stack.reverse()
+
+            sample = []
+            for name in stack:
+                if name not in frame_indices:
+                    frame_indices[name] = len(frames)
+                    frames.append({"name": name})
+                sample.append(frame_indices[name])
+            samples.append(sample)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": "GOAP search expansions",
+                "unit": "none",
+                "startValue": 0,
+                "endValue": len(samples),
+                "samples": samples,
+                "weights": [1] * len(samples)
+            }]
+        }
+
+    def save(self, path: str):
+        """
+        Saves the records to a JSON file.
+
+        Args:
+            path (str): The path of the file.
+        """
+        with open(path, "w") as file:
+            json.dump({"records": list(self.records)}, file)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchTrace":
+        """
+        Loads a trace saved with save().
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            SearchTrace: The loaded trace.
+        """
+        with open(path) as file:
+            records = [tuple(record) for record in json.load(file)["records"]]
+
+        trace = cls(capacity=max(len(records), 1))
+        trace.records.extend(records)
+        trace.next_node_id = max((record[1] for record in records), default=-1) + 1
+        return trace
@@ -0,0 +1,99 @@
+"""
+This module implements the clocks used to run the GOAP agents. The RealTimeClock waits for
+real, while the SimulationClock is a discrete event scheduler: waiting advances a virtual
+time and runs the scheduled callbacks in order. This allows running scenarios as fast as
+the CPU allows with a reproducible ordering of events.
+"""
+
+import heapq
+import threading
+import time
+
+
+class RealTimeClock:
+    def now(self) -> float:
+        """
+        Gives the current time.
+
+        Returns:
+            float: The current time in seconds.
+        """
+        return time.monotonic()
+
+    def sleep(self, duration: float):
+        """
+        Waits for the given duration.
+
+        Args:
+            duration (float): The time (in seconds) to wait.
+        """
+        time.sleep(duration)
+
+    def schedule(self, delay: float, callback, *args):
+        """
+        Calls the callback from a separate thread once the delay is over.
+
+        Args:
+            delay (float): The time (in seconds) to wait before calling the callback.
+            callback (Callable): The function to call.
+            *args: The arguments given to the callback.
+        """
+        timer = threading.Timer(delay, callback, args)
+        timer.daemon = True
+        timer.start()
+
+
+class SimulationClock:
+    def __init__(self):
+        """
+        Initializes the SimulationClock at time 0 with no scheduled events.
+        """
+        self.current_time = 0.0
+        self.scheduled_events = []
+        self.event_count = 0
+
+    def now(self) -> float:
+        """
+        Gives the current virtual time.
+
+        Returns:
+            float: The current virtual time in seconds.
+        """
+        return self.current_time
+
+    def sleep(self, duration: float):
+        """
+        Advances the virtual time by the given duration, running all the events scheduled
+        during that time.
+
+        Args:
+            duration (float): The virtual time (in seconds) to wait.
+        """
+        self.run_until(self.current_time + duration)
+
+    def schedule(self, delay: float, callback, *args):
+        """
+        Schedules a callback to be called once the virtual time has advanced by the delay.
+        Events scheduled at the same time are called in the order they were scheduled.
+
+        Args:
+            delay (float): The virtual time (in seconds) to wait before calling the callback.
+            callback (Callable): The function to call.
+            *args: The arguments given to the callback.
+        """
+        heapq.heappush(self.scheduled_events, (self.current_time + delay, self.event_count, callback, args))
+        self.event_count += 1
+
+    def run_until(self, end_time: float):
+        """
+        Runs in order all the events scheduled up to the end time, then sets the virtual time to it.
+
+        Args:
+            end_time (float): The virtual time (in seconds) to reach.
+        """
+        while self.scheduled_events and self.scheduled_events[0][0] <= end_time:
+            event_time, _, callback, args = heapq.heappop(self.scheduled_events)
+            self.current_time = event_time
+            callback(*args)
+
+        self.current_time = max(self.current_time, end_time)
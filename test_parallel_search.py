@@ -0,0 +1,54 @@
+"""
+Checks that the parallel planning mode finds plans with the same cost as the global mode,
+whatever the number of workers and the max depth.
+"""
+
+import unittest
+
+from action import Action
+from goal import Goal
+from goap_planner import GOAPPlanner, PlanningMode
+from main_fight import actions, opponents, update_fight_state
+
+
+class TestParallelSearch(unittest.TestCase):
+    def test_same_cost_as_global(self):
+        """
+        Compares the plan costs of the global and parallel modes on the fight domain with a blind search.
+        """
+        initial_state = {"x": 0, "y": 0, "stamina": 20, "health": 100, "blocking": 0, "in_range": 0,
+                         "damage_dealt": 0}
+        context = {"enemies": opponents, "update_state_callback": update_fight_state}
+        goal = Goal({"enemy_health_0": 0}, None)
+
+        for max_depth in range(4, 12):
+            planner = GOAPPlanner(actions, max_depth=max_depth, state_bounds={"x": (0, 9), "y": (0, 9)},
+                                  value_abstraction={"stamina": 40})
+            _, global_cost = planner.plan(initial_state, goal, context, mode=PlanningMode.GLOBAL)
+
+            for num_workers in (1, 2, 3, 4, 8):
+                with self.subTest(max_depth=max_depth, num_workers=num_workers):
+                    planner.num_workers = num_workers
+                    _, parallel_cost = planner.plan(initial_state, goal, context, mode=PlanningMode.PARALLEL)
+                    self.assertEqual(global_cost, parallel_cost)
+
+    def test_shallower_costlier_path(self):
+        """
+        The cheapest path to d=3 is too deep to reach d=4 before max_depth, so the worker owning d=3
+        must keep the costlier but shallower path too.
+        """
+        actions = [Action("A3", {}, {"d": 1}, 1, 1), Action("A4", {}, {"d": 3}, 1, 6)]
+        goal = Goal({"d": 4}, None)
+        for max_depth in range(2, 7):
+            planner = GOAPPlanner(actions, max_depth=max_depth)
+            _, global_cost = planner.plan({"d": 0}, goal, {}, mode=PlanningMode.GLOBAL)
+
+            for num_workers in (1, 2, 3, 4):
+                with self.subTest(max_depth=max_depth, num_workers=num_workers):
+                    planner.num_workers = num_workers
+                    _, parallel_cost = planner.plan({"d": 0}, goal, {}, mode=PlanningMode.PARALLEL)
+                    self.assertEqual(global_cost, parallel_cost)
+
+
+if __name__ == "__main__":
+    unittest.main()
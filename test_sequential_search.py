@@ -0,0 +1,84 @@
+"""
+Checks that the sequential planning mode, which shares its search graph between the goals, finds plans
+at least as cheap as planning each goal on its own with the global mode, even close to max_depth.
+"""
+
+import random
+import unittest
+
+from action import Action
+from goal import Goal
+from goap_planner import GOAPPlanner, PlanningMode
+
+
+def plan_each_goal(actions, start_state, goals, max_depth):
+    """
+    Plans the goals one after the other with the global mode and keeps the first plan found.
+
+    Args:
+        actions (List[Action]): The possible actions.
+        start_state (Dict[str, int]): The initial state.
+        goals (List[Goal]): The goals, in order.
+        max_depth (int): Max depth of the planner.
+
+    Returns:
+        Tuple[List[str], float]: The first plan found and its cost.
+    """
+    for goal in goals:
+        plan, cost = GOAPPlanner(actions, max_depth=max_depth).plan(start_state, goal, {}, mode=PlanningMode.GLOBAL)
+        if plan:
+            return plan, cost
+
+    return [], float('inf')
+
+
+class TestSequentialSearch(unittest.TestCase):
+    def test_shallower_costlier_path(self):
+        """
+        The cheapest path to d=3 is too deep to reach d=4 before max_depth, so the costlier but
+        shallower path to d=3 must be kept.
+        """
+        actions = [Action("A3", {}, {"d": 1}, 1, 1), Action("A4", {}, {"d": 3}, 1, 6)]
+        planner = GOAPPlanner(actions, max_depth=4)
+        plan, cost = planner.plan({"d": 0}, Goal({"d": 4}, None), {}, mode=PlanningMode.SEQUENTIAL)
+        self.assertEqual(sorted(plan), ["A3", "A4"])
+        self.assertEqual(cost, 7)
+
+    def test_random_problems(self):
+        """
+        Compares the sequential mode with planning each goal on its own on small random problems.
+        """
+        rng = random.Random(0)
+        variables = ["a", "b"]
+        start_state = {"a": 0, "b": 0}
+        for case in range(1500):
+            actions = []
+            for i in range(rng.randint(2, 4)):
+                preconditions = {k: rng.randint(0, 2) for k in variables if rng.random() < 0.3}
+                effects = {k: rng.choice([-1, 1, 2, 3]) for k in variables if rng.random() < 0.6} or {"a": 1}
+                actions.append(Action(f"A{i}", preconditions, effects, 1, rng.randint(1, 6)))
+            goals = [Goal({k: rng.randint(1, 5) for k in rng.sample(variables, rng.randint(1, 2))}, None)
+                     for _ in range(rng.randint(1, 2))]
+            max_depth = rng.randint(2, 5)
+
+            with self.subTest(case=case):
+                _, baseline_cost = plan_each_goal(actions, start_state, goals, max_depth)
+                planner = GOAPPlanner(actions, max_depth=max_depth)
+                plan, cost = planner.plan(start_state, goals, {}, mode=PlanningMode.SEQUENTIAL)
+                self.assertLessEqual(cost, baseline_cost)
+                if not plan:
+                    continue
+
+                self.assertLess(len(plan), max_depth)
+                state = dict(start_state)
+                for action_name in plan:
+                    action = next(a for a in actions if a.name == action_name)
+                    self.assertTrue(action.is_applicable(state))
+                    for k, v in action.effects.items():
+                        state[k] = state.get(k, 0) + v
+                self.assertEqual(sum(next(a for a in actions if a.name == name).cost for name in plan), cost)
+                self.assertTrue(any(goal.is_goal_achieved(state) for goal in goals))
+
+
+if __name__ == "__main__":
+    unittest.main()